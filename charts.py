@@ -0,0 +1,14 @@
+# Plotly layout options shared by the Streamlit page scripts.
+# The page script's top level reruns on every widget change; these are built once
+# at import and spread into each figure's layout.
+
+# --- LAYOUTS ---
+# Shared by all three charts. A constant uirevision keeps the user's
+# zoom/pan and legend state when a rerun sends an updated figure
+base_layout = dict(
+    hovermode="x unified", template="plotly_white", uirevision="static",
+    legend=dict(orientation="h", y=1.1, x=0.5, xanchor="center")
+)
+
+# Chart 2 (salary vs inflation): nothing in its layout depends on the inputs
+trajectory_layout = dict(**base_layout, xaxis_title="Year", yaxis_title="Salary (£)")
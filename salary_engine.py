@@ -0,0 +1,165 @@
+# Salary / inflation calculation engine shared by the Streamlit page scripts.
+# Importing is done once per process, so the tables below are built once rather
+# than on every rerun, and the cached results share a single namespace.
+from dataclasses import dataclass
+from itertools import product
+from types import SimpleNamespace
+
+import streamlit as st
+import numpy as np
+
+# --- DATA ---
+years = (2020, 2021, 2022, 2023, 2024, 2025)
+
+# Inflation Data (Percentage Change Year-on-Year - Year to March)
+# 2020 is base (0% change for calculation context, inflation applies to subsequent years)
+# Updated CPIH values based on ONS March figures: 
+# 2021 (1.0), 2022 (6.2), 2023 (8.9), 2024 (3.8), 2025 (3.4)
+inflation_data = {
+    'CPIH': {2021: 1.0, 2022: 6.2, 2023: 8.9, 2024: 3.8, 2025: 3.4},
+    'CPI':  {2021: 0.7, 2022: 7.0, 2023: 10.1, 2024: 3.2, 2025: 2.6},
+    'RPI':  {2021: 1.5, 2022: 9.0, 2023: 13.5, 2024: 4.3, 2025: 3.2}
+}
+
+# Pay Awards (Outstanding / Very Strong / Successful)
+# Format: {Year: [Outstanding, Very Strong, Successful]}
+pay_rates = {
+    2021: [3.25, 2.75, 2.30],
+    2022: [3.25, 2.75, 2.30], 
+    2023: [3.70, 2.70, 2.30], 
+    2024: [3.70, 2.70, 2.30],
+    2025: [3.70, 2.70, 2.30]
+}
+
+# Footnote Adjustments: {year: (salary band upper bounds, % uplift per band)}
+# A salary entering that year falls in the first band whose bound it does not exceed
+footnote_adjustments = {
+    # 2022: Low Earner Adjustment
+    # Logic: 30-50k = +1%, <=30k = +2%
+    2022: ([30000, 50000], [2.0, 1.0, 0.0]),
+    # 2023: Cost of Living Adjustment
+    # Logic: Flat +2% to base option
+    2023: ([], [2.0]),
+    # 2024: Variance Adjustment
+    # Logic: Low (<37k) +1%, High (>50k) -1%
+    2024: ([np.nextafter(37000, 0), 50000], [1.0, 0.0, -1.0]),
+}
+
+# Row order of the stacked tables below
+tiers = ('outstanding', 'verystrong', 'successful')
+inflation_indices = ('CPIH', 'CPI', 'RPI')
+
+# Index-major (Rows: 0=CPIH, 1=CPI, 2=RPI), 2021 onwards. Kept at float64:
+# float32 shifts the truncated £ figure by one for some starting salaries
+_inflation_matrix = np.array([[inflation_data[k][y] for y in years[1:]] for k in inflation_indices], dtype=np.float64)
+
+tables = SimpleNamespace(
+    years=years,
+    # 2020 is the base year with no rates of its own; the rate tables cover these years
+    plot_years=years[1:],
+    inflation_matrix=_inflation_matrix,
+    # Per-index row views of inflation_matrix, for lookups by name
+    inflation_rates=dict(zip(inflation_indices, _inflation_matrix)),
+    # Tier-major (Rows: 0=Outstanding, 1=Very Strong, 2=Successful) so each tier's rates are contiguous
+    pay_rates=np.array([[pay_rates[y][idx] for y in years[1:]] for idx in range(3)], dtype=np.float64),
+    adjustments={
+        year: (np.array(bounds, dtype=np.float64), np.array(uplifts, dtype=np.float64))
+        for year, (bounds, uplifts) in footnote_adjustments.items()
+    },
+)
+
+
+# --- CALCULATION LOGIC ---
+# Every trajectory plus the % change applied in each year (0.0 for the 2020 base)
+@dataclass(frozen=True)
+class Trajectories:
+    sal_outstanding: np.ndarray
+    sal_verystrong: np.ndarray
+    sal_successful: np.ndarray
+    inf_cpih: np.ndarray
+    inf_cpi: np.ndarray
+    inf_rpi: np.ndarray
+    m_outstanding: np.ndarray
+    m_verystrong: np.ndarray
+    m_successful: np.ndarray
+    m_cpih: np.ndarray
+    m_cpi: np.ndarray
+    m_rpi: np.ndarray
+
+# Compounding kernel: one row per series, one column per year from 2021.
+# 2020 is the base year (0% change); every later year is compounded in one pass
+def _compound(start_salary, pct_changes):
+    meta_changes = np.zeros((len(pct_changes), len(years)))
+    meta_changes[:, 1:] = pct_changes
+    trajectory = np.cumprod(1 + meta_changes / 100, axis=1)
+    trajectory *= start_salary
+    return trajectory, meta_changes
+
+# The enabled footnote adjustments for every flag combination (8 in total), resolved at
+# import to (year column, bounds, uplifts) so compute_all only visits the years that apply
+_active_adjustments = {
+    adj_flags: tuple(
+        (years.index(year) - 1, bounds, uplifts)
+        for (year, (bounds, uplifts)), apply_adj in zip(tables.adjustments.items(), adj_flags)
+        if apply_adj
+    )
+    for adj_flags in product((False, True), repeat=len(tables.adjustments))
+}
+
+# Inflation compounds the same way for every salary, so the cumulative growth factors
+# (and the per-year % changes) are fixed at import; a trajectory is one scaling of them
+_inflation_growth, _inflation_changes = _compound(1.0, tables.inflation_matrix)
+# Read-only: the rows of _inflation_changes end up in Trajectories (unchanged on a
+# compute_all cache miss), so a write through them would leak into every later salary
+_inflation_growth.setflags(write=False)
+_inflation_changes.setflags(write=False)
+
+# Inflation paths are one scaling of the precomputed factors, cheaper than a cache lookup,
+# so they are left uncached and only run on a compute_all miss (Rows: 0=CPIH, 1=CPI, 2=RPI)
+def inflation_trajectories(start_salary):
+    return _inflation_growth * start_salary, _inflation_changes
+
+# Salary Logic: all three tiers at once (Rows: 0=Outstanding, 1=Very Strong, 2=Successful).
+# With no footnote flags set this is a straight cumprod; only enabled adjustments need the running salary
+def salary_trajectories(start_salary, adj_flags):
+    base = tables.pay_rates
+    active = _active_adjustments[adj_flags]
+    if not active:
+        return _compound(start_salary, base)
+
+    # Apply Adjustments (in year order, as the salary bands depend on earlier awards)
+    # adj_flags lines up with the years in tables.adjustments (2022, 2023, 2024)
+    # Single forward pass: growth carries each tier's compounded factor up to column `done`
+    adj = np.zeros_like(base)
+    growth = np.ones(len(base))
+    done = 0
+    for i, bounds, uplifts in active:
+        growth *= np.prod(1 + (base[:, done:i] + adj[:, done:i]) / 100, axis=1)
+        done = i
+        current_val = start_salary * growth
+        adj[:, i] = uplifts[np.searchsorted(bounds, current_val)]
+
+    return _compound(start_salary, base + adj)
+
+# Pure function of its arguments (no widget state) so Streamlit can memoise it across reruns
+@st.cache_data(max_entries=64, show_spinner=False)
+def compute_all(start_salary, adj_flags):
+    sal, sal_changes = salary_trajectories(start_salary, adj_flags)
+    inf, inf_changes = inflation_trajectories(start_salary)
+    return Trajectories(*sal, *inf, *sal_changes, *inf_changes)
+
+def calculate_real_term_change(nominal_trajectory, inflation_trajectory):
+    # Real Value = Nominal Salary / (Inflation Index / Base Index)
+    # Inflation Index ratio is simply inflation_trajectory / start_salary, so
+    # (Real Value - start_salary) / start_salary reduces to nominal / inflation - 1
+    return (np.asarray(nominal_trajectory) / np.asarray(inflation_trajectory) - 1) * 100
+
+# Real-terms change of every tier against every index (9 series) in one broadcast, so
+# flipping the erosion index is a dict lookup: {(tier, index name): series}
+@st.cache_data(max_entries=64, show_spinner=False)
+def all_real_changes(start_salary, adj_flags):
+    paths = compute_all(start_salary, adj_flags)
+    salaries = np.stack([paths.sal_outstanding, paths.sal_verystrong, paths.sal_successful])
+    inflation = np.stack([paths.inf_cpih, paths.inf_cpi, paths.inf_rpi])
+    real = calculate_real_term_change(salaries[:, None], inflation[None])
+    return {(tier, index): real[i, j] for i, tier in enumerate(tiers) for j, index in enumerate(inflation_indices)}